@@ -1,11 +1,16 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import load_only
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import os
+import csv
 import json
-import pandas as pd
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import uuid
 from utils.resume_parser import ResumeParser
@@ -20,11 +25,14 @@ app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///resume_screening.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['CACHE_TYPE'] = 'SimpleCache'
+app.config['CACHE_DEFAULT_TIMEOUT'] = 3600
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 db = SQLAlchemy(app)
+cache = Cache(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
@@ -48,6 +56,7 @@ class JobDescription(db.Model):
     location = db.Column(db.String(200))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Bumped on every resume upload
 
 class Resume(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -63,14 +72,57 @@ class Resume(db.Model):
     matched_skills = db.Column(db.Text)  # JSON string
     skill_gaps = db.Column(db.Text)  # JSON string
     semantic_score = db.Column(db.Float, default=0)
+    # Lengths of the JSON lists above, stored so listings don't have to parse them
+    skill_count = db.Column(db.Integer, default=0)
+    matched_count = db.Column(db.Integer, default=0)
+    missing_count = db.Column(db.Integer, default=0)
     job_id = db.Column(db.Integer, db.ForeignKey('job_description.id'))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Serves the per-job listings ordered by score straight from the index
+db.Index('ix_resume_job_score', Resume.job_id, Resume.match_score.desc())
+
+# Ownership lookups (job id scoped to the current user) in one index probe
+db.Index('ix_job_owner', JobDescription.user_id, JobDescription.id)
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+def upgrade_schema():
+    """Add columns and indexes introduced after a database was created"""
+    inspector = inspect(db.engine)
+    with db.engine.begin() as connection:
+        added = set()
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=db.engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    added.add(f'{table.name}.{column.name}')
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        
+        if 'job_description.updated_at' in added:
+            connection.execute(text("UPDATE job_description SET updated_at = created_at"))
+        
+        # Backfill the skill counts of resumes stored before they existed
+        if 'resume.skill_count' in added:
+            connection.execute(text(
+                "UPDATE resume SET "
+                "skill_count = json_array_length(COALESCE(skills, '[]')), "
+                "matched_count = json_array_length(COALESCE(matched_skills, '[]')), "
+                "missing_count = json_array_length(COALESCE(skill_gaps, '[]'))"
+            ))
+
+def job_cache_key(prefix, job, object_id):
+    """Cache key for data derived from a job's resumes. It changes whenever
+    resumes are uploaded for the job, so stale entries are never served."""
+    updated_at = job.updated_at.isoformat() if job and job.updated_at else ''
+    return f'{prefix}:{object_id}:{updated_at}'
+
 # Routes
 @app.route('/')
 def index():
@@ -159,202 +211,276 @@ def create_job():
     
     return render_template('create_job.html')
 
+# Process pool shared by every upload request, started on first use
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def get_executor():
+    """Return the shared resume-processing pool, creating it on first use"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _EXECUTOR
+
+def _process_one(filepath, filename, required_skills, job_description):
+    """Parse and score a saved resume. Runs in a worker process, so it only
+    takes and returns picklable values."""
+    # Parse resume
+    resume_text = ResumeParser.extract_text_from_pdf(filepath)
+    parsed_data = ResumeParser.parse_resume(resume_text, filename)
+    
+    # Calculate match scores
+    return {
+        'filename': filename,
+        'resume_text': resume_text,
+        'parsed_data': parsed_data,
+        'match_score': ResumeParser.calculate_match_score(parsed_data, required_skills),
+        'skill_analysis': ResumeParser.analyze_skill_gap(parsed_data, required_skills),
+        'semantic_analysis': SemanticMatcher.semantic_match(resume_text, job_description)
+    }
+
 @app.route('/upload_resumes/<int:job_id>', methods=['POST'])
 @login_required
 def upload_resumes(job_id):
-    job = JobDescription.query.get_or_404(job_id)
-    if job.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
+    job = JobDescription.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
     
     files = request.files.getlist('resumes')
     results = []
     
-    for file in files:
-        if file and file.filename.endswith('.pdf'):
+    pdf_files = [file for file in files if file and file.filename.endswith('.pdf')]
+    
+    processed = []
+    if pdf_files:
+        required_skills = json.loads(job.required_skills)
+        # PDF parsing and scoring are CPU-bound, so spread them across processes.
+        # Each file is submitted as soon as it is saved, so workers parse while
+        # the remaining uploads are still being written to disk. Every upload gets
+        # its own path, so no save can rewrite a file a worker is reading.
+        # The pool is shared across requests, so workers are started only once.
+        executor = get_executor()
+        futures = []
+        for file in pdf_files:
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
             file.save(filepath)
-            
-            # Parse resume
-            resume_text = ResumeParser.extract_text_from_pdf(filepath)
-            parsed_data = ResumeParser.parse_resume(resume_text, filename)
-            
-            # Calculate match scores
-            required_skills = json.loads(job.required_skills)
-            match_score = ResumeParser.calculate_match_score(parsed_data, required_skills)
-            skill_analysis = ResumeParser.analyze_skill_gap(parsed_data, required_skills)
-            semantic_analysis = SemanticMatcher.semantic_match(resume_text, job.description)
-            
-            # Save to database
-            resume = Resume(
-                filename=filename,
-                name=parsed_data.get('name', ''),
-                email=parsed_data.get('email', ''),
-                phone=parsed_data.get('phone', ''),
-                skills=json.dumps(parsed_data.get('skills', [])),
-                experience=json.dumps(parsed_data.get('experience', [])),
-                education=json.dumps(parsed_data.get('education', [])),
-                raw_text=resume_text,
-                match_score=max(match_score, semantic_analysis['similarity_score']),
-                matched_skills=json.dumps(skill_analysis['matched']),
-                skill_gaps=json.dumps(skill_analysis['missing']),
-                semantic_score=semantic_analysis['similarity_score'],
-                job_id=job_id,
-                user_id=current_user.id
-            )
-            db.session.add(resume)
-            results.append({
-                'filename': filename,
-                'name': parsed_data.get('name', ''),
-                'match_score': resume.match_score
-            })
+            futures.append(executor.submit(_process_one, filepath, filename, required_skills, job.description))
+        processed = [future.result() for future in futures]
     
+    resumes_to_insert = []
+    for item in processed:
+        parsed_data = item['parsed_data']
+        skill_analysis = item['skill_analysis']
+        semantic_analysis = item['semantic_analysis']
+        
+        # Save to database
+        resume = Resume(
+            filename=item['filename'],
+            name=parsed_data.get('name', ''),
+            email=parsed_data.get('email', ''),
+            phone=parsed_data.get('phone', ''),
+            skills=json.dumps(parsed_data.get('skills', [])),
+            experience=json.dumps(parsed_data.get('experience', [])),
+            education=json.dumps(parsed_data.get('education', [])),
+            raw_text=item['resume_text'],
+            match_score=max(item['match_score'], semantic_analysis['similarity_score']),
+            matched_skills=json.dumps(skill_analysis['matched']),
+            skill_gaps=json.dumps(skill_analysis['missing']),
+            semantic_score=semantic_analysis['similarity_score'],
+            skill_count=len(parsed_data.get('skills', [])),
+            matched_count=len(skill_analysis['matched']),
+            missing_count=len(skill_analysis['missing']),
+            job_id=job_id,
+            user_id=current_user.id
+        )
+        resumes_to_insert.append(resume)
+        results.append({
+            'filename': item['filename'],
+            'name': parsed_data.get('name', ''),
+            'match_score': resume.match_score
+        })
+    
+    # Insert all rows in one batch instead of tracking each object in the session
+    db.session.bulk_save_objects(resumes_to_insert)
+    if resumes_to_insert:
+        # Drop the cached views for this job; the new timestamp changes their keys
+        cache.delete_many(
+            job_cache_key('job_results', job, job_id),
+            job_cache_key('skill_analysis_chart', job, job_id)
+        )
+        job.updated_at = datetime.utcnow()
     db.session.commit()
     return jsonify({'success': True, 'results': results})
 
 @app.route('/job_results/<int:job_id>')
 @login_required
 def job_results(job_id):
-    job = JobDescription.query.get_or_404(job_id)
-    if job.user_id != current_user.id:
-        return redirect(url_for('dashboard'))
+    job = JobDescription.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
     
-    resumes = Resume.query.filter_by(job_id=job_id).order_by(Resume.match_score.desc()).all()
-    
-    # Prepare data for charts
-    resume_data = []
-    for resume in resumes:
-        resume_data.append({
-            'id': resume.id,
-            'name': resume.name or resume.filename,
-            'email': resume.email,
-            'match_score': resume.match_score,
-            'semantic_score': resume.semantic_score,
-            'matched_skills': json.loads(resume.matched_skills or '[]'),
-            'skill_gaps': json.loads(resume.skill_gaps or '[]'),
-            'skills': json.loads(resume.skills or '[]')
-        })
+    cache_key = job_cache_key('job_results', job, job_id)
+    resume_data = cache.get(cache_key)
+    if resume_data is None:
+        # Skip raw_text and other large columns the page never shows
+        resumes = db.session.query(Resume).options(load_only(
+            Resume.id, Resume.filename, Resume.name, Resume.email,
+            Resume.match_score, Resume.semantic_score,
+            Resume.matched_skills, Resume.skill_gaps, Resume.skills
+        )).filter_by(job_id=job_id).order_by(Resume.match_score.desc()).all()
+        
+        # Prepare data for charts
+        resume_data = []
+        for resume in resumes:
+            resume_data.append({
+                'id': resume.id,
+                'name': resume.name or resume.filename,
+                'email': resume.email,
+                'match_score': resume.match_score,
+                'semantic_score': resume.semantic_score,
+                'matched_skills': json.loads(resume.matched_skills or '[]'),
+                'skill_gaps': json.loads(resume.skill_gaps or '[]'),
+                'skills': json.loads(resume.skills or '[]')
+            })
+        cache.set(cache_key, resume_data)
     
     return render_template('job_results.html', job=job, resumes=resume_data)
 
 @app.route('/resume_details/<int:resume_id>')
 @login_required
 def resume_details(resume_id):
-    resume = Resume.query.get_or_404(resume_id)
-    if resume.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
+    resume = Resume.query.filter_by(id=resume_id, user_id=current_user.id).first_or_404()
     
     job = JobDescription.query.get(resume.job_id)
     
-    # Generate job recommendations
-    resume_data = {
-        'skills': json.loads(resume.skills or '[]'),
-        'experience': json.loads(resume.experience or '[]'),
-        'education': json.loads(resume.education or '[]')
-    }
-    
-    recommendations = JobRecommendationEngine.generate_recommendations(resume_data)
-    feedback = JobRecommendationEngine.generate_feedback(
-        resume_data, 
-        json.loads(job.required_skills) if job else []
-    )
+    cache_key = job_cache_key('resume_details', job, resume_id)
+    details = cache.get(cache_key)
+    if details is None:
+        # Parse each JSON column once and reuse it below
+        skills = json.loads(resume.skills or '[]')
+        experience = json.loads(resume.experience or '[]')
+        education = json.loads(resume.education or '[]')
+        required_skills = json.loads(job.required_skills) if job else []
+        
+        # Generate job recommendations
+        resume_data = {
+            'skills': skills,
+            'experience': experience,
+            'education': education
+        }
+        
+        recommendations = JobRecommendationEngine.generate_recommendations(resume_data)
+        feedback = JobRecommendationEngine.generate_feedback(resume_data, required_skills)
+        
+        details = {
+            'resume': {
+                'name': resume.name,
+                'email': resume.email,
+                'phone': resume.phone,
+                'skills': skills,
+                'experience': experience,
+                'education': education,
+                'match_score': resume.match_score,
+                'semantic_score': resume.semantic_score,
+                'matched_skills': json.loads(resume.matched_skills or '[]'),
+                'skill_gaps': json.loads(resume.skill_gaps or '[]')
+            },
+            'job': {
+                'title': job.title if job else '',
+                'company': job.company if job else '',
+                'required_skills': required_skills
+            },
+            'recommendations': recommendations,
+            'feedback': feedback
+        }
+        cache.set(cache_key, details)
     
-    return jsonify({
-        'resume': {
-            'name': resume.name,
-            'email': resume.email,
-            'phone': resume.phone,
-            'skills': json.loads(resume.skills or '[]'),
-            'experience': json.loads(resume.experience or '[]'),
-            'education': json.loads(resume.education or '[]'),
-            'match_score': resume.match_score,
-            'semantic_score': resume.semantic_score,
-            'matched_skills': json.loads(resume.matched_skills or '[]'),
-            'skill_gaps': json.loads(resume.skill_gaps or '[]')
-        },
-        'job': {
-            'title': job.title if job else '',
-            'company': job.company if job else '',
-            'required_skills': json.loads(job.required_skills) if job else []
-        },
-        'recommendations': recommendations,
-        'feedback': feedback
-    })
+    return jsonify(details)
 
 @app.route('/export_csv/<int:job_id>')
 @login_required
 def export_csv(job_id):
-    job = JobDescription.query.get_or_404(job_id)
-    if job.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    resumes = Resume.query.filter_by(job_id=job_id).order_by(Resume.match_score.desc()).all()
-    
-    data = []
-    for resume in resumes:
-        data.append({
-            'Name': resume.name or resume.filename,
-            'Email': resume.email or '',
-            'Phone': resume.phone or '',
-            'Match Score': f"{resume.match_score:.1f}%",
-            'Semantic Score': f"{resume.semantic_score:.1f}%",
-            'Matched Skills': '; '.join(json.loads(resume.matched_skills or '[]')),
-            'Missing Skills': '; '.join(json.loads(resume.skill_gaps or '[]')),
-            'Total Skills': len(json.loads(resume.skills or '[]'))
-        })
+    job = JobDescription.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
     
-    df = pd.DataFrame(data)
+    # Only the exported columns, fetched in chunks rather than all at once
+    resumes = db.session.query(
+        Resume.name, Resume.filename, Resume.email, Resume.phone,
+        Resume.match_score, Resume.semantic_score,
+        Resume.matched_skills, Resume.skill_gaps, Resume.skill_count
+    ).filter(Resume.job_id == job_id).order_by(Resume.match_score.desc()).yield_per(200)
     
-    # Create CSV in memory
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
-    
-    # Convert to bytes
-    csv_data = io.BytesIO()
-    csv_data.write(output.getvalue().encode('utf-8'))
-    csv_data.seek(0)
+    def generate():
+        # One small buffer reused per row keeps memory constant for any result size
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        def flush():
+            data = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return data
+        
+        writer.writerow([
+            'Name', 'Email', 'Phone', 'Match Score', 'Semantic Score',
+            'Matched Skills', 'Missing Skills', 'Total Skills'
+        ])
+        yield flush()
+        
+        for resume in resumes:
+            writer.writerow([
+                resume.name or resume.filename,
+                resume.email or '',
+                resume.phone or '',
+                f"{resume.match_score:.1f}%",
+                f"{resume.semantic_score:.1f}%",
+                '; '.join(json.loads(resume.matched_skills or '[]')),
+                '; '.join(json.loads(resume.skill_gaps or '[]')),
+                resume.skill_count or 0
+            ])
+            yield flush()
     
-    return send_file(
-        csv_data,
+    filename = secure_filename(f'resume_analysis_{job.title}_{datetime.now().strftime("%Y%m%d")}.csv')
+    return Response(
+        stream_with_context(generate()),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'resume_analysis_{job.title}_{datetime.now().strftime("%Y%m%d")}.csv'
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
 
 @app.route('/skill_analysis_chart/<int:job_id>')
 @login_required
 def skill_analysis_chart(job_id):
-    job = JobDescription.query.get_or_404(job_id)
-    if job.user_id != current_user.id:
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    resumes = Resume.query.filter_by(job_id=job_id).all()
+    job = JobDescription.query.filter_by(id=job_id, user_id=current_user.id).first_or_404()
     
-    # Prepare chart data
-    chart_data = {
-        'match_scores': [resume.match_score for resume in resumes],
-        'names': [resume.name or resume.filename for resume in resumes],
-        'skill_categories': {},
-        'top_skills': {}
-    }
-    
-    # Analyze skill categories
-    all_skills = []
-    for resume in resumes:
-        skills = json.loads(resume.skills or '[]')
-        all_skills.extend(skills)
-    
-    # Count skill frequency
-    from collections import Counter
-    skill_counts = Counter(all_skills)
-    chart_data['top_skills'] = dict(skill_counts.most_common(10))
+    cache_key = job_cache_key('skill_analysis_chart', job, job_id)
+    chart_data = cache.get(cache_key)
+    if chart_data is None:
+        resumes = db.session.query(
+            Resume.match_score, Resume.name, Resume.filename
+        ).filter(Resume.job_id == job_id).all()
+        
+        # Prepare chart data
+        chart_data = {
+            'match_scores': [resume.match_score for resume in resumes],
+            'names': [resume.name or resume.filename for resume in resumes],
+            'skill_categories': {},
+            'top_skills': {}
+        }
+        
+        # Count skill frequency inside SQLite by expanding the JSON skill arrays
+        skill_counts = db.session.execute(text(
+            "SELECT skill.value, COUNT(*) AS total "
+            "FROM resume, json_each(resume.skills) AS skill "
+            "WHERE resume.job_id = :job_id "
+            "GROUP BY skill.value ORDER BY total DESC LIMIT 10"
+        ), {'job_id': job_id}).all()
+        chart_data['top_skills'] = dict(skill_counts)
+        cache.set(cache_key, chart_data)
     
     return jsonify(chart_data)
 
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         
         # Create default admin user if not exists
         if not User.query.filter_by(username='admin').first():
@@ -1,18 +1,170 @@
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import PCA
+import atexit
+import hashlib
 import json
+import os
+import pickle
+import threading
 from typing import List, Dict, Any, Tuple
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# INT8 dynamically quantized ONNX export published alongside the model.
+# Set BERT_BACKEND=torch to use the default PyTorch FP32 path instead.
+BERT_BACKEND = os.environ.get('BERT_BACKEND', 'onnx')
+ONNX_MODEL_FILE = os.environ.get('BERT_ONNX_FILE', 'onnx/model_qint8_avx2.onnx')
+
+# Skill embeddings persisted across restarts, keyed by a hash of the skill text
+EMBEDDING_CACHE_PATH = os.path.join('uploads', 'embeddings.pkl')
+EMBEDDING_CACHE_FORMAT = 'int8'
+
+# Process-wide model instance shared by every analyzer and request thread
+_MODEL = None
+_MODEL_ID = None
+_MODEL_LOCK = threading.Lock()
+
+# Process-wide embedding cache shared by every analyzer; loaded from disk on
+# first use and written back once on interpreter exit
+_EMB_CACHE = None
+_EMB_CACHE_DIRTY = False
+_EMB_CACHE_LOCK = threading.Lock()
+
+def _load_model() -> Tuple[SentenceTransformer, str]:
+    """Load the encoder on ONNX Runtime if possible, falling back to PyTorch"""
+    if BERT_BACKEND == 'onnx':
+        try:
+            model = SentenceTransformer(
+                MODEL_NAME,
+                backend='onnx',
+                model_kwargs={'file_name': ONNX_MODEL_FILE, 'provider': 'CPUExecutionProvider'}
+            )
+            return model, f"{MODEL_NAME}:onnx:{ONNX_MODEL_FILE}"
+        except Exception as e:
+            print(f"Error loading ONNX model, falling back to PyTorch: {e}")
+    
+    return SentenceTransformer(MODEL_NAME), f"{MODEL_NAME}:torch"
+
+def get_model() -> SentenceTransformer:
+    """Return the shared sentence-transformer model, loading it on first use"""
+    global _MODEL, _MODEL_ID
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                # Each gunicorn worker is its own process; one torch thread per
+                # worker avoids oversubscribing the CPU cores
+                if 'gunicorn' in os.environ.get('SERVER_SOFTWARE', ''):
+                    import torch
+                    torch.set_num_threads(1)
+                _MODEL, _MODEL_ID = _load_model()
+    return _MODEL
+
+def get_model_id() -> str:
+    """Identify the loaded model and backend, since their embeddings differ slightly"""
+    get_model()
+    return _MODEL_ID
+
+def _assign_categories(similarities: np.ndarray, labels: np.ndarray, threshold: float) -> np.ndarray:
+    """Pick the best category per row of a (skills x keywords) similarity matrix.
+    
+    The best category is the one holding the nearest keyword (k=1 inner-product
+    search), so only the argmax keyword per row is needed; labels maps each
+    keyword column to its category index. Returns -1 where the nearest keyword
+    doesn't clear the threshold.
+    """
+    nearest = similarities.argmax(axis=1)
+    nearest_similarities = np.take_along_axis(similarities, nearest[:, None], axis=1)[:, 0]
+    return np.where(nearest_similarities > threshold, labels[nearest], -1)
+
+def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization, 4x smaller than float32.
+    
+    Returns the int8 matrix and one float32 scale per row.
+    """
+    scales = np.abs(embeddings).max(axis=1)
+    scales[scales == 0] = 1.0
+    quantized = np.round(embeddings / scales[:, None] * 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+def dequantize_embeddings(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Recover float32 embeddings from quantize_embeddings output"""
+    return quantized.astype(np.float32) * (scales[:, None] / 127)
+
+def _embedding_key(text: str) -> str:
+    """Content-addressed cache key, so any edit to the text misses the cache"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+def _load_embedding_cache() -> Dict[str, Tuple[np.ndarray, float]]:
+    """Load cached embeddings from disk, ignoring caches built by another model,
+    backend or storage format"""
+    if not os.path.exists(EMBEDDING_CACHE_PATH):
+        return {}
+    
+    try:
+        with open(EMBEDDING_CACHE_PATH, 'rb') as file:
+            payload = pickle.load(file)
+        if payload.get('model') != get_model_id() or payload.get('format') != EMBEDDING_CACHE_FORMAT:
+            return {}
+        return payload['embeddings']
+    except Exception as e:
+        print(f"Error loading embedding cache: {e}")
+        return {}
+
+def get_embedding_cache() -> Dict[str, Tuple[np.ndarray, float]]:
+    """Return the shared embedding cache, loading it and scheduling its save on first use"""
+    global _EMB_CACHE
+    if _EMB_CACHE is None:
+        with _EMB_CACHE_LOCK:
+            if _EMB_CACHE is None:
+                _EMB_CACHE = _load_embedding_cache()
+                atexit.register(save_embedding_cache)
+    return _EMB_CACHE
+
+def _store_embeddings(texts: List[str], quantized: np.ndarray, scales: np.ndarray):
+    """Add quantized embeddings to the shared cache"""
+    global _EMB_CACHE_DIRTY
+    cache = get_embedding_cache()
+    with _EMB_CACHE_LOCK:
+        for text, vector, scale in zip(texts, quantized, scales):
+            cache[_embedding_key(text)] = (vector, float(scale))
+        _EMB_CACHE_DIRTY = True
+
+def save_embedding_cache():
+    """Write new cache entries to disk"""
+    global _EMB_CACHE_DIRTY
+    with _EMB_CACHE_LOCK:
+        if _EMB_CACHE is None or not _EMB_CACHE_DIRTY:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH) or '.', exist_ok=True)
+            tmp_path = f"{EMBEDDING_CACHE_PATH}.tmp"
+            with open(tmp_path, 'wb') as file:
+                payload = {
+                    'model': get_model_id(),
+                    'format': EMBEDDING_CACHE_FORMAT,
+                    'embeddings': _EMB_CACHE
+                }
+                pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, EMBEDDING_CACHE_PATH)
+            _EMB_CACHE_DIRTY = False
+        except Exception as e:
+            print(f"Error saving embedding cache: {e}")
+
 class BERTSkillAnalyzer:
     """
     Advanced skill analysis using BERT embeddings for semantic understanding
     """
     
     def __init__(self):
-        # Load pre-trained BERT model for sentence embeddings
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Shared pre-trained BERT model for sentence embeddings
+        self.model = get_model()
+        
+        # Shared persistent embedding cache
+        self._emb_cache = get_embedding_cache()
         
         # Predefined skill categories with semantic keywords
         self.skill_categories = {
@@ -46,6 +198,37 @@ class BERTSkillAnalyzer:
                 'problem solving', 'critical thinking', 'time management', 'agile', 'scrum'
             ]
         }
+        
+        # Encode all category keywords once (L2-normalized) into a single matrix so
+        # categorization never has to run them through the model again.
+        # _keyword_labels holds the category index of each keyword row.
+        self._category_names = list(self.skill_categories.keys())
+        keywords = [kw for category_keywords in self.skill_categories.values() for kw in category_keywords]
+        self._keyword_embeddings = self._encode(keywords)
+        self._keyword_labels = np.repeat(
+            np.arange(len(self._category_names)),
+            [len(category_keywords) for category_keywords in self.skill_categories.values()]
+        )
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts to L2-normalized embeddings, only running cache misses through the model"""
+        keys = [_embedding_key(text) for text in texts]
+        misses = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in self._emb_cache))
+        
+        if misses:
+            embeddings = self.model.encode(
+                misses, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+            )
+            # Stored as int8 plus a per-vector scale to keep the cache small
+            quantized, scales = quantize_embeddings(embeddings.astype(np.float32))
+            _store_embeddings(misses, quantized, scales)
+        
+        # Always served from the cache, so results don't depend on hit or miss
+        entries = [self._emb_cache[key] for key in keys]
+        return dequantize_embeddings(
+            np.vstack([vector for vector, _ in entries]),
+            np.array([scale for _, scale in entries], dtype=np.float32)
+        )
     
     def get_skill_embeddings(self, skills: List[str]) -> np.ndarray:
         """Generate BERT embeddings for a list of skills"""
@@ -58,46 +241,37 @@ class BERTSkillAnalyzer:
         if not cleaned_skills:
             return np.array([])
         
-        # Generate embeddings
-        embeddings = self.model.encode(cleaned_skills)
+        # Generate L2-normalized embeddings so cosine similarity is a plain dot product
+        embeddings = self._encode(cleaned_skills)
         return embeddings
     
-    def categorize_skills_semantic(self, skills: List[str]) -> Dict[str, List[str]]:
-        """Categorize skills using semantic similarity with BERT"""
+    def categorize_skills_semantic(self, skills: List[str], return_embeddings: bool = False):
+        """Categorize skills using semantic similarity with BERT.
+        
+        With return_embeddings=True, returns (categorized, {skill: embedding}) so
+        callers can reuse the embeddings instead of encoding the skills again.
+        """
+        empty = ({}, {}) if return_embeddings else {}
         if not skills:
-            return {}
+            return empty
         
-        skill_embeddings = self.get_skill_embeddings(skills)
+        # Blank skills are dropped before encoding, keep the rest aligned with their rows
+        valid_skills = [skill for skill in skills if skill.strip()]
+        skill_embeddings = self.get_skill_embeddings(valid_skills)
         if skill_embeddings.size == 0:
-            return {}
+            return empty
         
-        categorized = {category: [] for category in self.skill_categories.keys()}
+        categorized = {category: [] for category in self._category_names}
         
-        # Get embeddings for category keywords
-        category_embeddings = {}
-        for category, keywords in self.skill_categories.items():
-            category_embeddings[category] = self.model.encode(keywords)
+        # One matmul against every category keyword (embeddings are normalized, so
+        # this is cosine similarity), then the nearest keyword's category
+        similarities = skill_embeddings @ self._keyword_embeddings.T
+        best_indices = _assign_categories(similarities, self._keyword_labels, 0.3)
         
         # Categorize each skill
-        for i, skill in enumerate(skills):
-            if not skill.strip():
-                continue
-                
-            skill_embedding = skill_embeddings[i].reshape(1, -1)
-            best_category = None
-            best_similarity = 0
-            
-            for category, cat_embeddings in category_embeddings.items():
-                # Calculate similarity with all keywords in category
-                similarities = cosine_similarity(skill_embedding, cat_embeddings)
-                max_similarity = np.max(similarities)
-                
-                if max_similarity > best_similarity and max_similarity > 0.3:  # Threshold
-                    best_similarity = max_similarity
-                    best_category = category
-            
-            if best_category:
-                categorized[best_category].append(skill)
+        for skill, best_index in zip(valid_skills, best_indices):
+            if best_index >= 0:
+                categorized[self._category_names[best_index]].append(skill)
             else:
                 # If no good match, put in a general category
                 if 'Other' not in categorized:
@@ -105,7 +279,11 @@ class BERTSkillAnalyzer:
                 categorized['Other'].append(skill)
         
         # Remove empty categories
-        return {k: v for k, v in categorized.items() if v}
+        categorized = {k: v for k, v in categorized.items() if v}
+        
+        if return_embeddings:
+            return categorized, dict(zip(valid_skills, skill_embeddings))
+        return categorized
     
     def find_skill_gaps_semantic(self, candidate_skills: List[str], 
                                 job_requirements: List[str]) -> Dict[str, Any]:
@@ -119,8 +297,10 @@ class BERTSkillAnalyzer:
         if candidate_embeddings.size == 0 or job_embeddings.size == 0:
             return {'matched': [], 'missing': job_requirements, 'similarity_scores': {}}
         
-        # Calculate similarity matrix
-        similarity_matrix = cosine_similarity(job_embeddings, candidate_embeddings)
+        # Calculate similarity matrix (embeddings are normalized, so a matmul is cosine)
+        similarity_matrix = job_embeddings @ candidate_embeddings.T
+        max_similarities = similarity_matrix.max(axis=1)
+        best_match_indices = similarity_matrix.argmax(axis=1)
         
         matched_skills = []
         missing_skills = []
@@ -128,10 +308,7 @@ class BERTSkillAnalyzer:
         
         threshold = 0.5  # Semantic similarity threshold
         
-        for i, job_skill in enumerate(job_requirements):
-            max_similarity = np.max(similarity_matrix[i])
-            best_match_idx = np.argmax(similarity_matrix[i])
-            
+        for job_skill, max_similarity, best_match_idx in zip(job_requirements, max_similarities, best_match_indices):
             similarity_scores[job_skill] = {
                 'max_similarity': float(max_similarity),
                 'best_match': candidate_skills[best_match_idx] if max_similarity > threshold else None
@@ -157,16 +334,21 @@ class BERTSkillAnalyzer:
         if not skills or len(skills) < 2:
             return {'clusters': [], 'labels': []}
         
+        # Blank skills are dropped before encoding, keep the rest aligned with their rows
+        skills = [skill for skill in skills if skill.strip()]
         embeddings = self.get_skill_embeddings(skills)
-        if embeddings.size == 0:
+        if embeddings.size == 0 or len(skills) < 2:
             return {'clusters': [], 'labels': []}
         
         # Adjust number of clusters if we have fewer skills
         n_clusters = min(n_clusters, len(skills))
         
+        # Project to a few dimensions first; distance computations dominate K-means
+        projected = PCA(n_components=min(32, len(skills) - 1)).fit_transform(embeddings)
+        
         # Perform K-means clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        cluster_labels = kmeans.fit_predict(embeddings)
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3, batch_size=256)
+        cluster_labels = kmeans.fit_predict(projected)
         
         # Group skills by cluster
         clusters = {}
@@ -259,7 +441,7 @@ class BERTSkillAnalyzer:
         if not skills:
             return {}
         
-        categorized = self.categorize_skills_semantic(skills)
+        categorized, embeddings_by_skill = self.categorize_skills_semantic(skills, return_embeddings=True)
         scores = {}
         
         # Calculate scores based on number of skills and their semantic diversity
@@ -273,15 +455,17 @@ class BERTSkillAnalyzer:
             
             # Diversity bonus - check semantic diversity within category
             if len(category_skills) > 1:
-                embeddings = self.get_skill_embeddings(category_skills)
-                if embeddings.size > 0:
-                    # Calculate average pairwise distance
-                    similarity_matrix = cosine_similarity(embeddings)
-                    # Get upper triangle (excluding diagonal)
-                    upper_triangle = similarity_matrix[np.triu_indices_from(similarity_matrix, k=1)]
-                    avg_similarity = np.mean(upper_triangle) if len(upper_triangle) > 0 else 0
-                    diversity_score = (1 - avg_similarity) * 30  # Max 30 from diversity
-                    base_score += diversity_score
+                # Reuse the embeddings computed during categorization
+                embeddings = np.vstack([embeddings_by_skill[skill] for skill in category_skills])
+                
+                # Calculate average pairwise distance (embeddings are normalized)
+                similarity_matrix = embeddings @ embeddings.T
+                # Mean of the upper triangle (excluding diagonal); the matrix is
+                # symmetric, so that's the off-diagonal sum over n * (n - 1)
+                n = similarity_matrix.shape[0]
+                avg_similarity = (similarity_matrix.sum() - np.trace(similarity_matrix)) / (n * (n - 1))
+                diversity_score = (1 - avg_similarity) * 30  # Max 30 from diversity
+                base_score += diversity_score
             
             scores[category] = min(base_score, 100.0)  # Cap at 100
         
@@ -1,5 +1,27 @@
-from typing import List, Dict, Any
-from collections import defaultdict
+from typing import List, Dict, Any, Tuple
+from collections import Counter, defaultdict
+import heapq
+from utils.skill_extractor import SkillExtractor, partition_skill_matches
+
+def _index_job_requirements(job_categories: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, int], List[tuple]]:
+    """Give every required skill its own bit, and describe each job as (job title,
+    job data, required skills as a set, number of required skills, required skills as a bitmap)"""
+    all_skills = sorted({
+        skill.lower() for job_data in job_categories.values() for skill in job_data['required_skills']
+    })
+    skill_bits = {skill: 1 << bit for bit, skill in enumerate(all_skills)}
+    
+    requirements = []
+    for job_title, job_data in job_categories.items():
+        required_set = frozenset(skill.lower() for skill in job_data['required_skills'])
+        required_bits = 0
+        for skill in required_set:
+            required_bits |= skill_bits[skill]
+        requirements.append(
+            (job_title, job_data, required_set, len(job_data['required_skills']), required_bits)
+        )
+    
+    return skill_bits, requirements
 
 class JobRecommendationEngine:
     """
@@ -69,6 +91,10 @@ class JobRecommendationEngine:
             'growth_rate': 'Very High'
         }
     }
+    
+    # Required skills of every job as sets and bitmaps, so matching is a lookup per
+    # resume skill and jobs out of reach can be skipped with one AND
+    _SKILL_BITS, _JOB_REQUIREMENTS = _index_job_requirements(JOB_CATEGORIES)
 
     @classmethod
     def generate_recommendations(cls, resume_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -79,15 +105,36 @@ class JobRecommendationEngine:
         if not resume_skills:
             return recommendations
 
-        for job_title, job_data in cls.JOB_CATEGORIES.items():
+        # Normalize resume skills once; spelling variants map to the canonical skill,
+        # and a specific skill also stands for the general one it implies
+        skill_keys = []
+        for skill in resume_skills:
+            normalized = SkillExtractor.TECH_ALIASES.get(skill.lower(), skill.lower())
+            implied = SkillExtractor.SKILL_IMPLIES.get(normalized)
+            skill_keys.append((normalized, implied) if implied else (normalized,))
+
+        # Bitmap of the resume's job-relevant skills, and how often the most repeated one occurs
+        relevant_counts = Counter(
+            key for keys in skill_keys for key in keys if key in cls._SKILL_BITS
+        )
+        resume_bits = 0
+        for skill in relevant_counts:
+            resume_bits |= cls._SKILL_BITS[skill]
+        max_repeat = max(relevant_counts.values(), default=0)
+        
+        for job_title, job_data, required_set, required_count, required_bits in cls._JOB_REQUIREMENTS:
+            # Upper bound on matched skills; skip jobs that can't clear the 20% threshold
+            bound = bin(resume_bits & required_bits).count('1') * max_repeat
+            if round((bound / required_count) * 100) <= 20:
+                continue
+            
             # Calculate skill match
             matched_skills = [
-                skill for skill in resume_skills
-                if any(req_skill.lower() in skill.lower() or skill.lower() in req_skill.lower()
-                       for req_skill in job_data['required_skills'])
+                skill for skill, keys in zip(resume_skills, skill_keys)
+                if not required_set.isdisjoint(keys)
             ]
             
-            match_score = round((len(matched_skills) / len(job_data['required_skills'])) * 100)
+            match_score = round((len(matched_skills) / required_count) * 100)
             
             if match_score > 20:  # Only recommend if match score > 20%
                 reasons = [
@@ -110,29 +157,21 @@ class JobRecommendationEngine:
                     'matched_skills': matched_skills
                 })
 
-        # Sort by match score
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
-        return recommendations[:6]  # Return top 6 recommendations
+        # Return top 6 recommendations by match score
+        return heapq.nlargest(6, recommendations, key=lambda x: x['match_score'])
 
     @classmethod
-    def generate_feedback(cls, resume_data: Dict[str, Any], target_job_skills: List[str]) -> Dict[str, List[str]]:
-        """Generate detailed feedback for resume improvement"""
+    def generate_feedback(cls, resume_data: Dict[str, Any], target_job_skills: List[str],
+                          skill_categories: Dict[str, List[str]] = None) -> Dict[str, List[str]]:
+        """Generate detailed feedback for resume improvement
+        skill_categories may pass in an existing _categorize_skills result for the resume skills"""
         resume_skills = resume_data.get('skills', [])
         resume_experience = resume_data.get('experience', [])
         resume_education = resume_data.get('education', [])
         
         # Find matched and missing skills
-        matched_skills = [
-            skill for skill in resume_skills
-            if any(job_skill.lower() in skill.lower() or skill.lower() in job_skill.lower()
-                   for job_skill in target_job_skills)
-        ]
-        
-        missing_skills = [
-            job_skill for job_skill in target_job_skills
-            if not any(skill.lower() in job_skill.lower() or job_skill.lower() in skill.lower()
-                      for skill in resume_skills)
-        ]
+        matched_skills, _ = partition_skill_matches(resume_skills, target_job_skills)
+        _, missing_skills = partition_skill_matches(target_job_skills, resume_skills)
 
         # Generate strengths
         strengths = []
@@ -172,7 +211,8 @@ class JobRecommendationEngine:
         ])
         
         # Add skill-specific recommendations
-        skill_categories = cls._categorize_skills(resume_skills)
+        if skill_categories is None:
+            skill_categories = cls._categorize_skills(resume_skills)
         if len(skill_categories.get('programming', [])) < 2:
             recommendations.append("Learn additional programming languages to increase versatility")
         if len(skill_categories.get('cloud', [])) == 0:
@@ -209,12 +249,15 @@ class JobRecommendationEngine:
         return dict(categorized)
 
     @classmethod
-    def get_career_path_suggestions(cls, current_skills: List[str]) -> List[Dict[str, Any]]:
-        """Suggest career progression paths based on current skills"""
+    def get_career_path_suggestions(cls, current_skills: List[str],
+                                    skill_categories: Dict[str, List[str]] = None) -> List[Dict[str, Any]]:
+        """Suggest career progression paths based on current skills
+        skill_categories may pass in an existing _categorize_skills result for current_skills"""
         paths = []
         
         # Analyze current skill level
-        skill_categories = cls._categorize_skills(current_skills)
+        if skill_categories is None:
+            skill_categories = cls._categorize_skills(current_skills)
         
         # Junior to Mid-level paths
         if len(current_skills) < 8:
@@ -1,19 +1,64 @@
-import PyPDF2
 import re
 import io
 from typing import Dict, List, Any
+from utils.skill_extractor import SkillExtractor, compile_skill_pattern, find_skills, partition_skill_matches
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # fall back to the pure-Python extractor
+    pdfium = None
+    import PyPDF2
+
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+_PHONE_RE = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+def _word_prefix_pattern(keywords: List[str]) -> re.Pattern:
+    """Match any keyword at the start of a word, so inflected forms ('experiences',
+    'educational') count but a keyword inside another word ('network') doesn't"""
+    return re.compile(r'\b(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + ')')
+
+# Keywords marking a section header line (or, for names, ruling a line out)
+_NAME_EXCLUDE_RE = _word_prefix_pattern(['experience', 'education', 'skills', 'objective'])
+_EXPERIENCE_RE = _word_prefix_pattern(['experience', 'work', 'employment', 'career', 'position'])
+_EDUCATION_RE = _word_prefix_pattern(['education', 'university', 'college', 'degree',
+                                      'bachelor', 'master', 'phd'])
 
 class ResumeParser:
+    COMMON_SKILLS = [
+        'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js',
+        'html', 'css', 'typescript', 'sql', 'mongodb', 'postgresql', 'mysql',
+        'aws', 'azure', 'docker', 'kubernetes', 'git', 'agile', 'scrum',
+        'machine learning', 'ai', 'data science', 'analytics', 'tableau',
+        'powerbi', 'excel', 'project management', 'leadership', 'communication',
+        'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'kotlin', 'swift',
+        'django', 'flask', 'spring', 'laravel', 'express', 'next.js',
+        'redis', 'elasticsearch', 'jenkins', 'terraform', 'pandas', 'numpy'
+    ]
+    
+    # All common skills and technology spellings compiled into one pattern,
+    # built once at class load
+    _SKILL_PATTERN = compile_skill_pattern(COMMON_SKILLS + list(SkillExtractor.TECH_ALIASES))
+    
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
+            if pdfium is not None:
+                pages = []
+                pdf = pdfium.PdfDocument(file_path)
+                try:
+                    for page in pdf:
+                        textpage = page.get_textpage()
+                        pages.append(textpage.get_text_range().replace('\r\n', '\n'))
+                        textpage.close()
+                        page.close()
+                finally:
+                    pdf.close()
+            else:
+                with open(file_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    pages = [page.extract_text() for page in pdf_reader.pages]
+            return '\n'.join(pages)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
@@ -21,68 +66,64 @@ class ResumeParser:
     @staticmethod
     def parse_resume(text: str, filename: str) -> Dict[str, Any]:
         """Parse resume text and extract structured information"""
-        lines = text.lower().split('\n')
+        # Email and phone are matched on the original text; everything else on the lowercased copy
+        text_lower = text.lower()
+        lines = text_lower.split('\n')
         
         # Extract email
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_match = re.search(email_pattern, text)
+        email_match = _EMAIL_RE.search(text)
         email = email_match.group(0) if email_match else ''
         
         # Extract phone
-        phone_pattern = r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phone_match = re.search(phone_pattern, text)
+        phone_match = _PHONE_RE.search(text)
         phone = phone_match.group(0) if phone_match else ''
         
-        # Extract name (heuristic approach)
-        name_candidates = []
-        for line in lines[:5]:  # Check first 5 lines
-            line = line.strip()
-            if (len(line.split()) <= 4 and len(line) > 2 and 
-                not '@' in line and not any(char.isdigit() for char in line) and
-                not any(keyword in line for keyword in ['experience', 'education', 'skills', 'objective'])):
-                name_candidates.append(line.title())
-        
-        name = name_candidates[0] if name_candidates else filename.replace('.pdf', '').replace('_', ' ').title()
+        # Find the name and the experience and education headers in one pass over the lines
+        name = None
+        experience_start = None
+        education_start = None
+        for i, line in enumerate(lines):
+            # Extract name (heuristic approach)
+            if i < 5 and name is None:  # Check first 5 lines
+                candidate = line.strip()
+                if (len(candidate.split()) <= 4 and len(candidate) > 2 and 
+                    not '@' in candidate and not any(char.isdigit() for char in candidate) and
+                    not _NAME_EXCLUDE_RE.search(candidate)):
+                    name = candidate.title()
+            
+            if experience_start is None and _EXPERIENCE_RE.search(line):
+                experience_start = i
+            if education_start is None and _EDUCATION_RE.search(line):
+                education_start = i
+            
+            if i >= 4 and experience_start is not None and education_start is not None:
+                break
         
-        # Extract skills
-        common_skills = [
-            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node.js',
-            'html', 'css', 'typescript', 'sql', 'mongodb', 'postgresql', 'mysql',
-            'aws', 'azure', 'docker', 'kubernetes', 'git', 'agile', 'scrum',
-            'machine learning', 'ai', 'data science', 'analytics', 'tableau',
-            'powerbi', 'excel', 'project management', 'leadership', 'communication',
-            'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'kotlin', 'swift',
-            'django', 'flask', 'spring', 'laravel', 'express', 'next.js',
-            'redis', 'elasticsearch', 'jenkins', 'terraform', 'pandas', 'numpy'
-        ]
+        if name is None:
+            name = filename.replace('.pdf', '').replace('_', ' ').title()
         
-        skills = []
-        text_lower = text.lower()
-        for skill in common_skills:
-            if skill in text_lower:
-                skills.append(skill)
+        # Extract skills in a single scan of the text
+        found_skills = {
+            SkillExtractor.TECH_ALIASES.get(skill, skill)  # Spellings count as their canonical skill
+            for skill in find_skills(ResumeParser._SKILL_PATTERN, text_lower)
+        }
+        skills = [skill for skill in ResumeParser.COMMON_SKILLS if skill in found_skills]
         
         # Extract experience (simplified)
         experience = []
-        experience_keywords = ['experience', 'work', 'employment', 'career', 'position']
-        for i, line in enumerate(lines):
-            if any(keyword in line for keyword in experience_keywords):
-                # Get next few lines as experience
-                for j in range(i+1, min(i+4, len(lines))):
-                    if lines[j].strip() and len(lines[j].strip()) > 10:
-                        experience.append(lines[j].strip().title())
-                break
+        if experience_start is not None:
+            # Get next few lines as experience
+            for j in range(experience_start+1, min(experience_start+4, len(lines))):
+                if lines[j].strip() and len(lines[j].strip()) > 10:
+                    experience.append(lines[j].strip().title())
         
         # Extract education
         education = []
-        education_keywords = ['education', 'university', 'college', 'degree', 'bachelor', 'master', 'phd']
-        for i, line in enumerate(lines):
-            if any(keyword in line for keyword in education_keywords):
-                # Get next few lines as education
-                for j in range(i+1, min(i+3, len(lines))):
-                    if lines[j].strip() and len(lines[j].strip()) > 5:
-                        education.append(lines[j].strip().title())
-                break
+        if education_start is not None:
+            # Get next few lines as education
+            for j in range(education_start+1, min(education_start+3, len(lines))):
+                if lines[j].strip() and len(lines[j].strip()) > 5:
+                    education.append(lines[j].strip().title())
         
         return {
             'name': name,
@@ -99,21 +140,9 @@ class ResumeParser:
         if not resume_data.get('skills') or not job_skills:
             return 0.0
         
-        resume_skills = [skill.lower() for skill in resume_data['skills']]
-        job_skills_lower = [skill.lower() for skill in job_skills]
-        
-        matched_skills = []
-        for resume_skill in resume_skills:
-            for job_skill in job_skills_lower:
-                if (resume_skill in job_skill or job_skill in resume_skill or
-                    resume_skill == job_skill):
-                    matched_skills.append(resume_skill)
-                    break
+        matched_skills, _ = partition_skill_matches(resume_data['skills'], job_skills)
         
-        if len(job_skills_lower) == 0:
-            return 0.0
-        
-        return (len(matched_skills) / len(job_skills_lower)) * 100
+        return (len(matched_skills) / len(job_skills)) * 100
     
     @staticmethod
     def analyze_skill_gap(resume_data: Dict[str, Any], job_skills: List[str]) -> Dict[str, List[str]]:
@@ -121,25 +150,7 @@ class ResumeParser:
         if not resume_data.get('skills'):
             return {'matched': [], 'missing': job_skills, 'match_percentage': 0}
         
-        resume_skills = [skill.lower() for skill in resume_data['skills']]
-        job_skills_lower = [skill.lower() for skill in job_skills]
-        
-        matched = []
-        missing = []
-        
-        for job_skill in job_skills:
-            job_skill_lower = job_skill.lower()
-            is_matched = False
-            
-            for resume_skill in resume_skills:
-                if (resume_skill in job_skill_lower or job_skill_lower in resume_skill or
-                    resume_skill == job_skill_lower):
-                    matched.append(job_skill)
-                    is_matched = True
-                    break
-            
-            if not is_matched:
-                missing.append(job_skill)
+        matched, missing = partition_skill_matches(job_skills, resume_data['skills'])
         
         match_percentage = (len(matched) / len(job_skills)) * 100 if job_skills else 0
         
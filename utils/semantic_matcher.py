@@ -1,8 +1,14 @@
 import re
 from typing import List, Dict, Tuple
 from collections import Counter
+from functools import lru_cache
+import heapq
 import math
 
+_NONWORD_RE = re.compile(r'[^\w\s]')
+# The same replacement for ASCII text as a str.translate table
+_NONWORD_TABLE = {code: ' ' for code in range(128) if _NONWORD_RE.match(chr(code))}
+
 class SemanticMatcher:
     """
     Simulated BERT-based semantic matching
@@ -28,12 +34,22 @@ class SemanticMatcher:
         'development': ['dev', 'programming', 'coding'],
         'management': ['mgmt', 'leadership', 'supervision']
     }
+    
+    # Each synonym group as a set, and every word of a group mapped to its key
+    _SYN_GROUPS = {key: frozenset([key] + synonyms) for key, synonyms in SYNONYMS.items()}
+    _SYN_INDEX = {word: key for key, synonyms in SYNONYMS.items() for word in [key] + synonyms}
 
     @classmethod
     def preprocess_text(cls, text: str) -> List[str]:
         """Preprocess text by cleaning and tokenizing"""
+        return list(cls._tokens(text))
+
+    @classmethod
+    def _tokens(cls, text: str) -> Tuple[str, ...]:
+        """preprocess_text as a tuple of words"""
         # Convert to lowercase and remove special characters
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
+        text = text.lower()
+        text = text.translate(_NONWORD_TABLE) if text.isascii() else _NONWORD_RE.sub(' ', text)
         
         # Split into words
         words = text.split()
@@ -44,67 +60,76 @@ class SemanticMatcher:
             if len(word) > 2 and word not in cls.COMMON_WORDS
         ]
         
-        return filtered_words
+        return tuple(filtered_words)
 
     @classmethod
     def expand_with_synonyms(cls, words: List[str]) -> List[str]:
         """Expand word list with synonyms"""
-        expanded = words.copy()
+        return list(cls._expanded(tuple(words)))
+
+    @classmethod
+    def _expanded(cls, words: Tuple[str, ...]) -> frozenset:
+        """expand_with_synonyms for a tuple of preprocessed words, as a set"""
+        expanded = set(words)
         
         for word in words:
-            for key, synonyms in cls.SYNONYMS.items():
-                if word in synonyms or word == key:
-                    expanded.extend([key] + synonyms)
+            key = cls._SYN_INDEX.get(word)
+            if key:
+                expanded.update(cls._SYN_GROUPS[key])
         
-        return list(set(expanded))  # Remove duplicates
+        return frozenset(expanded)
+
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _job_terms(cls, job_description: str) -> Tuple[frozenset, frozenset]:
+        """Synonym-expanded and plain word sets of a job description. Cached, since
+        every resume of an upload is matched against the same few descriptions;
+        resume texts are one-off and deliberately not cached."""
+        job_words = cls._tokens(job_description)
+        return cls._expanded(job_words), frozenset(job_words)
 
     @classmethod
     def calculate_cosine_similarity(cls, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts"""
-        words1 = cls.preprocess_text(text1)
-        words2 = cls.preprocess_text(text2)
-        
         # Expand with synonyms for better matching
-        words1 = cls.expand_with_synonyms(words1)
-        words2 = cls.expand_with_synonyms(words2)
-        
-        # Create word frequency vectors
-        all_words = list(set(words1 + words2))
-        
-        if not all_words:
-            return 0.0
+        words1 = cls._expanded(cls._tokens(text1))
+        words2 = cls._expanded(cls._tokens(text2))
         
-        vector1 = [words1.count(word) for word in all_words]
-        vector2 = [words2.count(word) for word in all_words]
-        
-        # Calculate cosine similarity
-        dot_product = sum(a * b for a, b in zip(vector1, vector2))
-        magnitude1 = math.sqrt(sum(a * a for a in vector1))
-        magnitude2 = math.sqrt(sum(a * a for a in vector2))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
+        return cls._as_percentage(cls._cosine_raw(words1, words2))
+
+    @classmethod
+    def _cosine_raw(cls, words1: frozenset, words2: frozenset) -> float:
+        """Unrounded cosine similarity (0 to 1) between two sets of distinct words, whose
+        frequency vectors are all ones: shared words over the geometric mean of the sizes"""
+        if not words1 or not words2:
             return 0.0
         
-        similarity = dot_product / (magnitude1 * magnitude2)
+        return len(words1 & words2) / (math.sqrt(len(words1)) * math.sqrt(len(words2)))
+
+    @classmethod
+    def _as_percentage(cls, similarity: float) -> float:
+        """Similarity as a percentage rounded to 2 decimals, as reported"""
         return round(similarity * 100, 2)
 
     @classmethod
     def find_key_matches(cls, text1: str, text2: str) -> List[str]:
         """Find key matching terms between two texts"""
-        words1 = set(cls.preprocess_text(text1))
-        words2 = set(cls.preprocess_text(text2))
+        words1 = set(cls._tokens(text1))
+        words2 = set(cls._tokens(text2))
         
+        return cls._key_matches_from_words(words1, words2)
+
+    @classmethod
+    def _key_matches_from_words(cls, words1: set, words2: set) -> List[str]:
+        """Key matching terms between two sets of preprocessed words"""
         # Direct matches
         matches = words1.intersection(words2)
         
-        # Synonym matches
-        synonym_matches = set()
-        for word1 in words1:
-            for word2 in words2:
-                for key, synonyms in cls.SYNONYMS.items():
-                    if ((word1 in synonyms or word1 == key) and 
-                        (word2 in synonyms or word2 == key)):
-                        synonym_matches.add(key)
+        # Synonym matches: groups with a word on both sides
+        synonym_matches = (
+            {cls._SYN_INDEX[word] for word in words1 if word in cls._SYN_INDEX} &
+            {cls._SYN_INDEX[word] for word in words2 if word in cls._SYN_INDEX}
+        )
         
         all_matches = matches.union(synonym_matches)
         
@@ -149,8 +174,32 @@ class SemanticMatcher:
         Perform semantic matching between resume and job description
         Returns similarity score, key matches, and insights
         """
-        similarity_score = cls.calculate_cosine_similarity(resume_text, job_description)
-        key_matches = cls.find_key_matches(resume_text, job_description)
+        return cls.batch_semantic_match([resume_text], job_description)[0]
+
+    @classmethod
+    def batch_semantic_match(cls, resume_texts: List[str], job_description: str) -> List[Dict[str, any]]:
+        """
+        Perform semantic matching of many resumes against one job description
+        The job description is preprocessed once and reused for every resume
+        Returns one result per resume, in input order
+        """
+        job_expanded, job_word_set = cls._job_terms(job_description)
+        
+        results = []
+        for resume_text in resume_texts:
+            resume_words = cls._tokens(resume_text)
+            # Expanded words are distinct, so the set form of the cosine applies
+            similarity = cls._cosine_raw(cls._expanded(resume_words), job_expanded)
+            key_matches = cls._key_matches_from_words(set(resume_words), job_word_set)
+            results.append(cls._build_match_result(similarity, key_matches))
+        
+        return results
+
+    @classmethod
+    def _build_match_result(cls, similarity: float, key_matches: List[str]) -> Dict[str, any]:
+        """Assemble the semantic match result for one resume from its unrounded similarity"""
+        # Round once here; insights and quality grade the reported score
+        similarity_score = cls._as_percentage(similarity)
         insights = cls.generate_semantic_insights(similarity_score, key_matches)
         
         return {
@@ -173,16 +222,15 @@ class SemanticMatcher:
             return "Poor"
 
     @classmethod
-    def batch_semantic_analysis(cls, resumes: List[str], job_description: str) -> List[Dict[str, any]]:
-        """Perform semantic analysis on multiple resumes"""
-        results = []
+    def batch_semantic_analysis(cls, resumes: List[str], job_description: str,
+                                k: int = None) -> List[Dict[str, any]]:
+        """Perform semantic analysis on multiple resumes, returning the top k (default all)"""
+        results = cls.batch_semantic_match(resumes, job_description)
         
-        for i, resume_text in enumerate(resumes):
-            result = cls.semantic_match(resume_text, job_description)
+        for i, result in enumerate(results):
             result['resume_index'] = i
-            results.append(result)
-        
-        # Sort by similarity score
-        results.sort(key=lambda x: x['similarity_score'], reverse=True)
         
-        return results
\ No newline at end of file
+        # Best k by similarity score
+        if k is None:
+            k = len(results)
+        return heapq.nlargest(k, results, key=lambda x: x['similarity_score'])
\ No newline at end of file
@@ -1,5 +1,76 @@
 import re
-from typing import List, Dict
+from typing import List, Dict, Set, Tuple
+
+# Years-of-experience requirements, each capturing the number of years
+_EXPERIENCE_RES = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(\d+)\+?\s*years?\s*(of\s*)?experience',
+        r'(\d+)\+?\s*year\s*experience',
+        r'minimum\s*(\d+)\s*years?',
+        r'at\s*least\s*(\d+)\s*years?'
+    )
+]
+
+def compile_skill_pattern(skills: List[str]) -> re.Pattern:
+    """Compile skill keywords into a single case-insensitive pattern so a text
+    is scanned for every skill in one pass. Longer skills are tried first, and
+    a match can't be glued to surrounding letters or digits ('go' won't match
+    inside 'google'). A trailing version number is allowed but not part of the
+    match, so 'python3' or 'c++17' still count as 'python' and 'c++'."""
+    alternatives = sorted({skill.lower() for skill in skills}, key=len, reverse=True)
+    return re.compile(
+        r'(?<![a-z0-9])(?:' + '|'.join(re.escape(skill) for skill in alternatives) + r')'
+        r'(?=(?:\d+(?:\.\d+)*)?(?![a-z0-9]))',
+        re.IGNORECASE
+    )
+
+def find_skills(pattern: re.Pattern, text: str) -> Set[str]:
+    """Return the lowercased skills from a compiled skill pattern found in text
+    
+    >>> pattern = compile_skill_pattern(['python', 'html', 'css', 'c++', 'c#', 'vue', 'angular', 'go'])
+    >>> sorted(find_skills(pattern, 'HTML5, CSS3, Python3.11, C++17, C#10, Vue3 and Angular2+'))
+    ['angular', 'c#', 'c++', 'css', 'html', 'python', 'vue']
+    >>> sorted(find_skills(pattern, 'google, go2go, golang'))
+    []
+    """
+    return {match.group(0).lower() for match in pattern.finditer(text)}
+
+def partition_skill_matches(skills: List[str], targets: List[str]) -> Tuple[List[str], List[str]]:
+    """Split skills into those matching any target skill and those that don't.
+    
+    Matching is case-insensitive and one skill containing the other counts as a
+    match. Exact matches are resolved with a set lookup; only the remaining
+    skills are checked for substrings.
+    """
+    targets_lower = [target.lower() for target in targets]
+    target_set = set(targets_lower)
+    
+    matched = []
+    unmatched = []
+    for skill in skills:
+        skill_lower = skill.lower()
+        if skill_lower in target_set or any(
+            target in skill_lower or skill_lower in target for target in targets_lower
+        ):
+            matched.append(skill)
+        else:
+            unmatched.append(skill)
+    
+    return matched, unmatched
+
+def first_matching_category(skill: str, categories: Dict[str, List[str]], default: str = 'other') -> str:
+    """Return the first category with a skill containing, or contained in, the
+    given skill (case-insensitive), or default if none does"""
+    skill_lower = skill.lower()
+    for category, category_skills in categories.items():
+        if any(cat_skill.lower() in skill_lower or skill_lower in cat_skill.lower()
+               for cat_skill in category_skills):
+            return category
+    return default
+
+def index_skill_categories(skills: List[str], categories: Dict[str, List[str]]) -> Dict[str, str]:
+    """Map each lowercased skill to its first_matching_category"""
+    return {skill.lower(): first_matching_category(skill, categories) for skill in skills}
 
 class SkillExtractor:
     # Predefined skill categories and keywords
@@ -29,6 +100,30 @@ class SkillExtractor:
             'teamwork', 'problem solving', 'critical thinking'
         ]
     }
+    
+    # Spellings of specific technologies, reported as written and as their category skill
+    TECH_ALIASES = {
+        'react.js': 'react', 'reactjs': 'react',
+        'node.js': 'node.js', 'nodejs': 'node.js',
+        'vue.js': 'vue', 'vuejs': 'vue',
+        'next.js': 'next.js', 'nextjs': 'next.js',
+        'express.js': 'express', 'expressjs': 'express'
+    }
+    
+    # Specific skills that also satisfy a more general requirement
+    SKILL_IMPLIES = {
+        'mysql': 'sql', 'postgresql': 'sql', 'sqlite': 'sql'
+    }
+    
+    _KNOWN_SKILLS = [skill for skills in SKILL_CATEGORIES.values() for skill in skills] + list(TECH_ALIASES)
+    
+    # Every category skill and technology spelling compiled into one pattern,
+    # built once at class load
+    _SKILL_PATTERN = compile_skill_pattern(_KNOWN_SKILLS)
+    
+    # Category of every known skill and technology spelling, resolved once at
+    # class load with the same rule categorize_skills applies to other skills
+    _SKILL_TO_CAT = index_skill_categories(_KNOWN_SKILLS, SKILL_CATEGORIES)
 
     @classmethod
     def extract_skills_from_jd(cls, job_description: str) -> List[str]:
@@ -36,26 +131,18 @@ class SkillExtractor:
         text = job_description.lower()
         extracted_skills = []
         
-        # Extract skills from all categories
-        for category, skills in cls.SKILL_CATEGORIES.items():
-            for skill in skills:
-                if skill.lower() in text:
-                    extracted_skills.append(skill)
+        # Extract skills from all categories and specific technologies mentioned
+        # in a single scan of the text
+        for skill in find_skills(cls._SKILL_PATTERN, text):
+            extracted_skills.append(skill)
+            if skill in cls.TECH_ALIASES:
+                extracted_skills.append(cls.TECH_ALIASES[skill])
         
         # Extract years of experience requirements
-        experience_patterns = [
-            r'(\d+)\+?\s*years?\s*(of\s*)?experience',
-            r'(\d+)\+?\s*year\s*experience',
-            r'minimum\s*(\d+)\s*years?',
-            r'at\s*least\s*(\d+)\s*years?'
-        ]
-        
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                years = match[0] if isinstance(match, tuple) else match
-                extracted_skills.append(f"{years}+ years experience")
-                break  # Only add one experience requirement
+        for pattern in _EXPERIENCE_RES:
+            match = pattern.search(text)  # Only add one experience requirement per pattern
+            if match:
+                extracted_skills.append(f"{match.group(1)}+ years experience")
         
         # Extract education requirements
         education_keywords = ['bachelor', 'master', 'phd', 'degree', 'certification', 'diploma']
@@ -63,20 +150,6 @@ class SkillExtractor:
             if keyword in text:
                 extracted_skills.append(keyword)
         
-        # Extract specific technologies mentioned
-        tech_patterns = [
-            r'\b(react\.js|reactjs)\b',
-            r'\b(node\.js|nodejs)\b',
-            r'\b(vue\.js|vuejs)\b',
-            r'\b(next\.js|nextjs)\b',
-            r'\b(express\.js|expressjs)\b'
-        ]
-        
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                extracted_skills.append(match)
-        
         return list(set(extracted_skills))  # Remove duplicates
     
     @classmethod
@@ -93,39 +166,44 @@ class SkillExtractor:
         }
         
         for skill in skills:
-            skill_lower = skill.lower()
-            categorized_flag = False
-            
-            for category, category_skills in cls.SKILL_CATEGORIES.items():
-                if any(cat_skill.lower() in skill_lower or skill_lower in cat_skill.lower() 
-                       for cat_skill in category_skills):
-                    categorized[category].append(skill)
-                    categorized_flag = True
-                    break
-            
-            if not categorized_flag:
-                categorized['other'].append(skill)
+            category = cls._SKILL_TO_CAT.get(skill.lower())
+            if category is None:
+                category = first_matching_category(skill, cls.SKILL_CATEGORIES)
+            categorized[category].append(skill)
         
         return categorized
     
+    # Headings whose following text marks a skill as more important
+    IMPORTANT_SECTIONS = ['requirements', 'qualifications', 'must have', 'essential']
+    
     @classmethod
     def get_skill_importance_score(cls, skill: str, job_description: str) -> float:
         """Calculate importance score of a skill based on frequency in JD"""
+        return cls.score_all_skills(job_description, [skill])[skill]
+    
+    @classmethod
+    def score_all_skills(cls, job_description: str, skills: List[str]) -> Dict[str, float]:
+        """Calculate the importance score of every skill against one JD.
+        The JD is lowercased and its important sections located once for all skills."""
         text = job_description.lower()
-        skill_lower = skill.lower()
         
-        # Count occurrences
-        count = text.count(skill_lower)
+        # Text following each important section present in the JD
+        section_texts = []
+        for section in cls.IMPORTANT_SECTIONS:
+            section_start = text.find(section)
+            if section_start >= 0:
+                section_texts.append(text[section_start:section_start + 500])  # Next 500 chars
         
-        # Check if skill appears in important sections
-        important_sections = ['requirements', 'qualifications', 'must have', 'essential']
-        importance_bonus = 0
-        
-        for section in important_sections:
-            if section in text:
-                section_start = text.find(section)
-                section_text = text[section_start:section_start + 500]  # Next 500 chars
-                if skill_lower in section_text:
-                    importance_bonus += 2
+        scores = {}
+        for skill in skills:
+            skill_lower = skill.lower()
+            
+            # Count occurrences
+            count = text.count(skill_lower)
+            
+            # Check if skill appears in important sections
+            importance_bonus = 2 * sum(skill_lower in section_text for section_text in section_texts)
+            
+            scores[skill] = min(count + importance_bonus, 10)  # Cap at 10
         
-        return min(count + importance_bonus, 10)  # Cap at 10
\ No newline at end of file
+        return scores
\ No newline at end of file